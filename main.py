@@ -1,42 +1,679 @@
+import asyncio
+import contextvars
 import json
-from typing import Dict, List, Optional, Any
+import os
+import random
+import re
+import time
+from collections import OrderedDict, deque
+from functools import partial
+from itertools import islice
+from operator import itemgetter
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple, Union
 import aiohttp
 from astrbot.api.event import filter, AstrMessageEvent
 from astrbot.api.star import Context, Star, register
 from astrbot.api import logger, llm_tool
 
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> str:
+        """序列化为JSON字符串（orjson 默认输出UTF-8，不转义非ASCII字符）"""
+        return orjson.dumps(obj).decode()
+
+    _loads = orjson.loads
+except ImportError:  # 未安装 orjson 时回退到标准库
+    def _dumps(obj: Any) -> str:
+        """序列化为JSON字符串"""
+        return json.dumps(obj, ensure_ascii=False)
+
+    _loads = json.loads
+
+
+# 请求超时，避免上游挂起时长时间阻塞
+_REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=15, connect=5, sock_read=10)
+# 解析播放地址（_SLOW_ENDPOINTS）需要上游实时解析，全集解析可能耗时较长
+_SLOW_REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=120, connect=5)
+# 同时在途的API请求上限，防止LLM并发调用工具时压垮上游；
+# 实际上限在 [_MIN_CONCURRENCY, _MAX_CONCURRENCY] 间按 AIMD 规则调整
+_MAX_CONCURRENCY = 16
+_MIN_CONCURRENCY = 2
+# 每分钟请求数上限（滑动窗口）
+_RPM_LIMIT = 120
+# 请求延迟的滑动平均超过该值（秒）或返回以下状态码时视为上游过载
+_LATENCY_TARGET = 3.0
+_OVERLOAD_STATUSES = frozenset({429, 502, 503})
+# 解析播放地址的端点本身就慢且失败率高，其延迟、超时和 5xx 不代表整个上游过载，
+# 只有 429 会参与并发上限的调整；超时后也不重试，避免重复触发昂贵的解析
+_SLOW_ENDPOINTS = frozenset({"/vod/parse/single", "/vod/parse/all"})
+# 限流/服务端错误/连接错误/超时的重试次数（共尝试 _MAX_RETRIES + 1 次）及可重试状态码
+_MAX_RETRIES = 2
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+_MAX_RETRY_DELAY = 10.0
+# 指数退避: min(_BACKOFF_CAP, _BACKOFF_BASE * 2**attempt) 再叠加 [0, _BACKOFF_JITTER) 的随机抖动
+_BACKOFF_BASE = 0.25
+_BACKOFF_CAP = 8.0
+_BACKOFF_JITTER = 0.25
+# 批量获取分类短剧时的页数上限
+_MAX_ALL_PAGES = 10
+# 批量获取多页时的并发数
+_GATHER_CONCURRENCY = 8
+# /短剧推荐 命令展示的推荐数量，启动预热使用同一参数以命中相同的缓存键
+_RECOMMEND_COMMAND_SIZE = 5
+# 各端点响应缓存的有效期（秒），未列出的端点不缓存
+_CACHE_TTLS = {
+    "/vod/categories": 86400,  # 分类几乎不变，另持久化到本地文件跨重启复用
+    "/vod/recommend": 60,
+    "/vod/latest": 60,
+    "/vod/list": 300,
+    "/vod/search": 120,
+    "/vod/parse/single": 600,
+    "/vod/parse/all": 600,
+}
+_CACHE_MAX_ENTRIES = 512
+# 命令回复文本缓存的条目上限，回复与生成它的响应缓存同时过期
+_TEXT_CACHE_MAX_ENTRIES = 256
+# 当前任务最近一次 _make_request 所得响应缓存的过期时间，未缓存时为 None
+_response_expiry: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("_response_expiry", default=None)
+# 缓存过期后用 ETag/Last-Modified 条件请求重新验证的端点
+_REVALIDATE_ENDPOINTS = frozenset({"/vod/categories"})
+# 分类列表的本地持久化文件，修改时间在有效期内时启动即可直接使用
+_CATEGORIES_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "astrbot_duanju", "categories.json")
+
+
+def _read_categories_file() -> Optional[Tuple[float, Dict[str, Any]]]:
+    """读取持久化的分类列表，返回 (剩余有效秒数, 缓存内容)；文件缺失、过期或损坏时返回 None"""
+    try:
+        age = time.time() - os.path.getmtime(_CATEGORIES_CACHE_FILE)
+        remaining = _CACHE_TTLS["/vod/categories"] - age
+        if remaining <= 0:
+            return None
+        with open(_CATEGORIES_CACHE_FILE, "rb") as f:
+            payload = _loads(f.read())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(payload, dict) or not isinstance(payload.get("data"), dict):
+        return None
+    return remaining, payload
+
+
+def _write_categories_file(content: str):
+    """原子写入分类列表持久化文件，先写临时文件再替换，避免读到半截内容"""
+    os.makedirs(os.path.dirname(_CATEGORIES_CACHE_FILE), exist_ok=True)
+    tmp_path = f"{_CATEGORIES_CACHE_FILE}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, _CATEGORIES_CACHE_FILE)
+    except OSError:
+        # 写入或替换失败时清理临时文件
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class _ApiError(str):
+    """API请求失败时返回的错误信息，用类型区分正常响应"""
+    __slots__ = ()
+
+
+_ApiResult = Union[Dict[str, Any], _ApiError]
+# 查询参数以 (键, 值) 序列传入，顺序固定，可直接作为缓存键
+_Params = List[Tuple[str, Any]]
+
+
+class _AdaptiveLimiter:
+    """API请求限流器
+
+    - 滑动窗口限制每分钟请求数
+    - 按 AIMD 规则调整并发上限：上游过载时减半，持续成功后逐步加一
+    - 收到 Retry-After 时暂停发出新请求
+    """
+
+    def __init__(self, rpm_limit: int, max_concurrency: int, min_concurrency: int, latency_target: float):
+        self._rpm_limit = rpm_limit
+        self._window: Deque[float] = deque()  # 最近一分钟内的请求时间
+        self._max = max_concurrency
+        self._min = min_concurrency
+        self._limit = max_concurrency
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._latency_target = latency_target
+        self._latency_ema: Optional[float] = None
+        self._successes = 0
+        self._last_decrease = 0.0
+        self._paused_until = 0.0
+
+    def pause(self, seconds: float):
+        """在指定秒数内暂停发出新请求"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def acquire(self):
+        """先等待并发名额，再等待速率名额；等待中被取消时不占用任何名额"""
+        await self._acquire_slot()
+        try:
+            await self._acquire_rate()
+        except asyncio.CancelledError:
+            self._in_flight -= 1
+            self._wake()
+            raise
+
+    async def _acquire_slot(self):
+        """等待并发名额"""
+        if self._in_flight < self._limit and not self._waiters:
+            self._in_flight += 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            await fut  # 名额由 release 直接转交
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # 名额已转交但调用方被取消，归还名额
+                self._in_flight -= 1
+                self._wake()
+            raise
+
+    async def _acquire_rate(self):
+        """等待暂停结束及滑动窗口空出名额，确定发出请求时才记入窗口"""
+        while True:
+            now = time.monotonic()
+            if now < self._paused_until:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+            window = self._window
+            while window and now - window[0] >= 60:
+                window.popleft()
+            if len(window) < self._rpm_limit:
+                window.append(now)
+                return
+            await asyncio.sleep(60 - (now - window[0]))
+
+    def release(self, latency: Optional[float], overloaded: bool):
+        """归还名额，并根据本次请求的结果调整并发上限
+
+        Args:
+            latency: 请求耗时（秒），为 None 时本次请求只在 overloaded 时参与调整
+            overloaded: 上游是否明确表示过载
+        """
+        self._in_flight -= 1
+        if latency is None and not overloaded:
+            self._wake()
+            return
+        if latency is not None:
+            ema = self._latency_ema
+            self._latency_ema = latency if ema is None else ema * 0.8 + latency * 0.2
+        if overloaded or self._latency_ema > self._latency_target:
+            # 乘性减，每秒最多一次，避免同一波失败把上限直接压到最低
+            now = time.monotonic()
+            if now - self._last_decrease >= 1.0:
+                self._limit = max(self._min, self._limit // 2)
+                self._last_decrease = now
+            self._successes = 0
+        else:
+            # 加性增，连续成功次数达到当前上限时加一
+            self._successes += 1
+            if self._successes >= self._limit and self._limit < self._max:
+                self._limit += 1
+                self._successes = 0
+        self._wake()
+
+    def _wake(self):
+        """把空出的名额转交给等待者"""
+        waiters = self._waiters
+        while waiters and self._in_flight < self._limit:
+            fut = waiters.popleft()
+            if not fut.done():
+                self._in_flight += 1
+                fut.set_result(None)
+
+
+def _retry_delay(retry_after: Optional[str], attempt: int) -> float:
+    """计算重试前的等待秒数，优先使用上游返回的 Retry-After"""
+    if retry_after:
+        try:
+            return min(max(float(retry_after), 0.0), _MAX_RETRY_DELAY)
+        except ValueError:
+            pass  # HTTP-date 格式，回退到指数退避
+    # 随机抖动避免并发请求在同一时刻集中重试
+    return min(_BACKOFF_CAP, _BACKOFF_BASE * 2 ** attempt) + random.random() * _BACKOFF_JITTER
+
+
+# 命令参数: 命令名 数字ID [数字]，第二个数字之后的多余内容忽略
+_ID_ARGS_RE = re.compile(r"^\S+\s+(\d+)(?:\s+(\d+)(?:\s|$)|\s*$)")
+# 命令参数: 命令名 剧名（剧名可含空格，首尾空白不计入）
+_SEARCH_RE = re.compile(r"^\S+\s+(\S.*?)\s*$", re.S)
+
+# 列表接口默认最多投影的条目数，调用方只展示部分结果时可传入更小的值
+_DEFAULT_MAX_ITEMS = 50
+
+# 短剧列表项中对外暴露的字段，列表数据以 columns/rows 的列式结构返回
+_DRAMA_FIELDS = ("id", "name", "cover", "update_time", "score")
+_drama_getter = itemgetter(*_DRAMA_FIELDS)
+_CATEGORY_FIELDS = ("id", "name")
+
+
+def _project_drama(drama: Dict[str, Any]) -> Dict[str, Any]:
+    """提取短剧列表项中需要的字段，缺失的字段不补 None，命令输出仍可使用默认占位文本"""
+    try:
+        return dict(zip(_DRAMA_FIELDS, _drama_getter(drama)))
+    except KeyError:
+        return {key: drama[key] for key in _DRAMA_FIELDS if key in drama}
+
+
+def _drama_row(drama: Dict[str, Any]) -> tuple:
+    """按 _DRAMA_FIELDS 的顺序提取短剧列表项的字段"""
+    try:
+        return _drama_getter(drama)
+    except KeyError:  # 上游偶尔缺少字段时补 None
+        get = drama.get
+        return tuple(get(key) for key in _DRAMA_FIELDS)
+
+
+# 命令输出中单个短剧的展示模板
+_ROW_FMT = "🎬 {name}\n   📊 评分: {score}\n   🆔 ID: {id}\n   📅 更新: {update_time}\n\n"
+
+
+class _DefaultDict(dict):
+    """配合 str.format_map 使用，缺失字段以占位文本代替"""
+    __slots__ = ()
+
+    def __missing__(self, key: str) -> str:
+        return "未知" if key == "name" else "N/A"
+
+
+# 剧集回复中简介的最大展示字符数
+_DESCRIPTION_MAX_LEN = 100
+
+
+def _truncate(text: str, limit: int = _DESCRIPTION_MAX_LEN) -> str:
+    """按字符数截断文本，超出部分以 ... 代替"""
+    return text if len(text) <= limit else f"{text[:limit]}..."
+
+
+def _format_drama_rows(dramas) -> str:
+    """按 _ROW_FMT 渲染短剧列表
+
+    Args:
+        dramas: 按 _DRAMA_FIELDS 排列的数据行，或上游/投影后的短剧字典
+    """
+    fmt = _ROW_FMT.format_map
+    return "".join(
+        fmt(dict(zip(_DRAMA_FIELDS, drama)) if isinstance(drama, tuple) else _DefaultDict(drama))
+        for drama in dramas
+    )
+
 
 @register("duanju_search", "Sugayoiya", "短剧搜索工具，支持LLM函数调用", "1.0.0", "https://github.com/Sugayoiya/astrbot_plugin_duanju.git")
 class DuanjuSearchPlugin(Star):
+    API_BASE = "https://api.r2afosne.dpdns.org"
+
     def __init__(self, context: Context):
         super().__init__(context)
-        self.api_base = "https://api.r2afosne.dpdns.org"
         self.session = None
+        self._closed = False  # terminate 之后不再发起请求，也不再重建会话
+        self._limiter = _AdaptiveLimiter(_RPM_LIMIT, _MAX_CONCURRENCY, _MIN_CONCURRENCY, _LATENCY_TARGET)
+        # 响应缓存: (endpoint, 参数) -> (过期时间, 响应数据, ETag, Last-Modified)，按LRU淘汰
+        self._cache: OrderedDict[tuple, tuple] = OrderedDict()
+        # 在途请求: (endpoint, 参数) -> Task，相同请求并发时只发送一次
+        self._inflight: Dict[tuple, asyncio.Task] = {}
+        # 命令回复缓存: (命令, 参数...) -> (过期时间, 回复文本)
+        self._text_cache: OrderedDict[tuple, tuple] = OrderedDict()
+        self._categories_cache: Optional[tuple] = None  # (原始响应, 整理后的数据)
+        self._prewarm_task: Optional[asyncio.Task] = None
+        # 后台写盘等任务，保留引用防止被回收，关闭时等待其完成
+        self._background_tasks: Set[asyncio.Task] = set()
+        self._categories_json: Optional[tuple] = None  # (data, 序列化结果)
 
     async def initialize(self):
         """初始化HTTP客户端"""
-        self.session = aiohttp.ClientSession()
+        self._closed = False
+        self._get_session()
+        # 后台预热分类和推荐缓存，首个用户请求即可命中缓存
+        self._prewarm_task = asyncio.create_task(self._prewarm())
         logger.info("短剧搜索插件初始化完成")
 
     async def terminate(self):
         """清理资源"""
+        self._closed = True
+        # 取消预热和在途请求并等待其结束，避免关闭后仍有请求访问上游；后台写盘任务等待其完成
+        tasks = [task for task in (self._prewarm_task, *self._inflight.values()) if task and not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, *self._background_tasks, return_exceptions=True)
         if self.session:
             await self.session.close()
         logger.info("短剧搜索插件已关闭")
 
-    async def _make_request(self, endpoint: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
-        """发起API请求的通用方法"""
+    def _get_session(self) -> Optional[aiohttp.ClientSession]:
+        """获取HTTP会话，未创建或意外关闭时重新创建；插件 terminate 之后返回 None，不再重建"""
+        if self._closed:
+            return None
+        if self.session is None or self.session.closed:
+            self.session = self._create_session()
+        return self.session
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        """创建HTTP会话"""
+        # 所有请求都指向同一主机，复用连接池以避免重复的TCP/TLS握手
+        connector = aiohttp.TCPConnector(
+            limit=32,
+            limit_per_host=16,
+            keepalive_timeout=75,
+            ttl_dns_cache=300,
+            enable_cleanup_closed=True
+        )
+        return aiohttp.ClientSession(
+            base_url=self.API_BASE,
+            connector=connector,
+            timeout=_REQUEST_TIMEOUT,
+            headers={
+                "Connection": "keep-alive",
+                "Accept": "application/json",
+                "User-Agent": "astrbot_plugin_duanju/1.0.0"
+            },
+            json_serialize=_dumps
+        )
+
+    async def _make_request(self, endpoint: str, params: Optional[_Params] = None) -> _ApiResult:
+        """发起API请求的通用方法，有效期内直接返回缓存，并合并相同的在途请求"""
+        key = (endpoint, tuple(params) if params else ())
+        entry = self._cache.get(key)
+        if entry is not None and time.monotonic() < entry[0]:
+            self._cache.move_to_end(key)
+            _response_expiry.set(entry[0])
+            return entry[1]
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_and_cache(key, endpoint, params))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # 单个调用方被取消时不影响其他等待同一请求的调用方
+        result = await asyncio.shield(task)
+        entry = self._cache.get(key)
+        _response_expiry.set(entry[0] if entry is not None and entry[1] is result else None)
+        return result
+
+    async def _fetch_and_cache(self, key: tuple, endpoint: str, params: Optional[_Params]) -> _ApiResult:
+        """请求并写入响应缓存，过期条目支持条件请求重新验证"""
+        stale = self._cache.get(key) if endpoint in _REVALIDATE_ENDPOINTS else None
+        headers = None
+        if stale is not None:
+            headers = {}
+            if stale[2]:
+                headers["If-None-Match"] = stale[2]
+            if stale[3]:
+                headers["If-Modified-Since"] = stale[3]
+
+        result, etag, last_modified = await self._fetch(endpoint, params, headers or None)
+        if result is None:  # 304 Not Modified，沿用缓存的数据
+            result = stale[1]
+
+        ttl = _CACHE_TTLS.get(endpoint)
+        if ttl is not None and not isinstance(result, _ApiError):  # 不缓存错误响应
+            self._cache[key] = (time.monotonic() + ttl, result, etag, last_modified)
+            self._cache.move_to_end(key)
+            if len(self._cache) > _CACHE_MAX_ENTRIES:
+                self._cache.popitem(last=False)
+            if endpoint == "/vod/categories":
+                # 写盘放到后台，等待同一请求的调用方不必等文件IO
+                task = asyncio.create_task(self._save_categories_file(result, etag, last_modified))
+                self._background_tasks.add(task)
+                task.add_done_callback(self._background_tasks.discard)
+        return result
+
+    async def _load_categories_file(self):
+        """从本地文件恢复分类列表的响应缓存"""
+        loaded = await asyncio.to_thread(_read_categories_file)
+        key = ("/vod/categories", ())
+        if loaded is None or key in self._cache:
+            return
+        remaining, payload = loaded
+        self._cache[key] = (
+            time.monotonic() + remaining, payload["data"], payload.get("etag"), payload.get("last_modified")
+        )
+        logger.info("已从本地文件加载短剧分类缓存")
+
+    async def _save_categories_file(self, data: Dict[str, Any], etag: Optional[str], last_modified: Optional[str]):
+        """持久化分类列表，写入失败只记录日志"""
+        content = _dumps({"data": data, "etag": etag, "last_modified": last_modified})
         try:
-            url = f"{self.api_base}{endpoint}"
-            async with self.session.get(url, params=params) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    logger.error(f"API请求失败: {response.status}")
-                    return {"error": f"API请求失败: {response.status}"}
-        except Exception as e:
-            logger.error(f"请求异常: {str(e)}")
-            return {"error": f"请求异常: {str(e)}"}
+            await asyncio.to_thread(_write_categories_file, content)
+        except OSError as e:
+            logger.warning(f"保存短剧分类缓存失败: {str(e)}")
+
+    async def _fetch(
+        self, endpoint: str, params: Optional[_Params] = None, headers: Optional[Dict[str, str]] = None
+    ) -> Tuple[Optional[_ApiResult], Optional[str], Optional[str]]:
+        """实际发起HTTP请求，遇到限流、服务端错误、连接错误或超时时退避重试（_SLOW_ENDPOINTS 超时不重试）
+
+        Returns:
+            (响应数据, ETag, Last-Modified)，条件请求命中 304 时响应数据为 None
+        """
+        slow = endpoint in _SLOW_ENDPOINTS
+        timeout = _SLOW_REQUEST_TIMEOUT if slow else _REQUEST_TIMEOUT
+        for attempt in range(_MAX_RETRIES + 1):
+            session = self._get_session()
+            if session is None:
+                return _ApiError("插件已关闭"), None, None
+            await self._limiter.acquire()
+            started = time.monotonic()
+            overloaded = False
+            succeeded = False  # 只有成功的请求才计入延迟并参与加性增
+            error = None
+            status = retry_after = None
+            try:
+                async with session.get(endpoint, params=params, headers=headers, timeout=timeout) as response:
+                    etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+                    if response.status == 304 and headers:
+                        # 304 响应未带校验值时沿用请求中携带的
+                        etag = etag or headers.get("If-None-Match")
+                        last_modified = last_modified or headers.get("If-Modified-Since")
+                        succeeded = True
+                        return None, etag, last_modified
+                    if response.ok:
+                        data = _loads(await response.read())
+                        succeeded = True
+                        return data, etag, last_modified
+                    status = response.status
+                    overloaded = status == 429 if slow else status in _OVERLOAD_STATUSES
+                    retry_after = response.headers.get("Retry-After")
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                # 连接断开或超时视为暂时性故障，可以重试
+                timed_out = isinstance(e, asyncio.TimeoutError)
+                overloaded = not slow and timed_out
+                error = f"请求异常: {str(e) or type(e).__name__}"
+                if slow and timed_out:
+                    logger.error(error)
+                    return _ApiError(error), None, None
+            except (aiohttp.ClientError, ValueError) as e:
+                logger.error(f"请求异常: {str(e)}")
+                return _ApiError(f"请求异常: {str(e)}"), None, None
+            finally:
+                # 失败或将要重试的请求不计为成功，只传递过载信号
+                latency = time.monotonic() - started if succeeded and not slow else None
+                self._limiter.release(latency, overloaded)
+
+            if error is None:
+                error = f"API请求失败: {status}"
+                if status not in _RETRY_STATUSES:
+                    # 其余 4xx 等终止性错误不重试
+                    logger.error(error)
+                    return _ApiError(error), None, None
+            if attempt == _MAX_RETRIES:
+                error = f"{error}（已重试 {attempt} 次）"
+                logger.error(error)
+                return _ApiError(error), None, None
+
+            # 等待期间释放并发名额；上游明确要求等待时暂停所有新请求
+            delay = _retry_delay(retry_after, attempt)
+            if retry_after:
+                self._limiter.pause(delay)
+            logger.warning(f"{error}，{delay:.1f} 秒后重试")
+            await asyncio.sleep(delay)
+
+    async def _gather_limited(
+        self, factories: Iterable[Callable[[], Awaitable[Any]]], limit: int = _GATHER_CONCURRENCY
+    ) -> List[Any]:
+        """并发执行 factories 创建的协程，同时运行的数量不超过 limit，结果按传入顺序返回
+
+        协程在取得名额后才创建，整体被取消时不会留下从未 await 的协程
+        """
+        sem = asyncio.Semaphore(limit)
+
+        async def run(factory):
+            async with sem:
+                return await factory()
+
+        return await asyncio.gather(*(run(factory) for factory in factories))
+
+    async def _prewarm(self):
+        """预取分类列表和 /短剧推荐 命令的推荐数据，填充响应缓存"""
+        # 本地文件仍有效时分类列表无需请求上游
+        await self._load_categories_file()
+        results = await asyncio.gather(
+            self._get_categories_data(),
+            self._get_recommend_data(size=_RECOMMEND_COMMAND_SIZE),
+        )
+        errors = [result for result in results if isinstance(result, _ApiError)]
+        if errors:
+            logger.warning(f"预热短剧缓存失败: {errors[0]}")
+        else:
+            logger.info("短剧缓存预热完成")
+
+    def _get_cached_text(self, key: tuple) -> Optional[str]:
+        """读取未过期的命令回复缓存"""
+        entry = self._text_cache.get(key)
+        if entry is not None and time.monotonic() < entry[0]:
+            self._text_cache.move_to_end(key)
+            return entry[1]
+        return None
+
+    def _cache_text(self, key: tuple, text: str):
+        """缓存命令回复文本，与刚刚取得的响应缓存同时过期，响应未缓存时不缓存回复"""
+        expires = _response_expiry.get()
+        if expires is None or expires <= time.monotonic():
+            return
+        self._text_cache[key] = (expires, text)
+        self._text_cache.move_to_end(key)
+        if len(self._text_cache) > _TEXT_CACHE_MAX_ENTRIES:
+            self._text_cache.popitem(last=False)
+
+    # 数据获取（返回dict，供LLM工具与命令处理器共用）
+    async def _get_categories_data(self) -> _ApiResult:
+        """获取分类列表数据"""
+        result = await self._make_request("/vod/categories")
+        if isinstance(result, _ApiError):
+            return result
+
+        # 命中响应缓存时复用上次整理好的结果
+        cached = self._categories_cache
+        if cached is not None and cached[0] is result:
+            return cached[1]
+
+        rows = [(cat.get("type_id"), cat.get("type_name")) for cat in result.get("categories", ())]
+
+        data = {
+            "columns": _CATEGORY_FIELDS,
+            "rows": rows,
+            "total": result.get("total", 0)
+        }
+        self._categories_cache = (result, data)
+        return data
+
+    async def _search_dramas_data(self, name: str, max_items: Optional[int] = _DEFAULT_MAX_ITEMS) -> _ApiResult:
+        """获取搜索结果数据，rows 最多 max_items 条（None 表示不限），total 仍为上游总数"""
+        result = await self._make_request("/vod/search", [("name", name)])
+        if isinstance(result, _ApiError):
+            return result
+
+        return {
+            "total": result.get("total", 0),
+            "columns": _DRAMA_FIELDS,
+            "rows": [_drama_row(drama) for drama in result.get("list", ())[:max_items]]
+        }
+
+    async def _get_category_dramas_data(
+        self, category_id: int, page: int = 1, max_items: Optional[int] = _DEFAULT_MAX_ITEMS
+    ) -> _ApiResult:
+        """获取分类短剧数据，rows 最多 max_items 条（None 表示不限），total 仍为上游总数"""
+        result = await self._make_request("/vod/list", [("categoryId", category_id), ("page", page)])
+        if isinstance(result, _ApiError):
+            return result
+
+        return {
+            "total": result.get("total", 0),
+            "current_page": result.get("currentPage", page),
+            "total_pages": result.get("totalPages", 1),
+            "columns": _DRAMA_FIELDS,
+            "rows": [_drama_row(drama) for drama in result.get("list", ())[:max_items]]
+        }
+
+    async def _get_all_category_dramas_data(self, category_id: int, max_pages: int = 5) -> _ApiResult:
+        """并发获取分类下多页短剧数据"""
+        # 多页合并时不截断单页，避免结果中间出现缺口
+        first = await self._get_category_dramas_data(category_id, 1, None)
+        if isinstance(first, _ApiError):
+            return first
+
+        # 先取第一页得到总页数，其余页并发获取
+        last_page = min(first["total_pages"], max(1, min(max_pages, _MAX_ALL_PAGES)))
+        pages = await self._gather_limited(
+            partial(self._get_category_dramas_data, category_id, page, None) for page in range(2, last_page + 1)
+        )
+
+        rows = list(first["rows"])
+        pages_fetched = 1
+        for page, page_data in enumerate(pages, start=2):
+            if isinstance(page_data, _ApiError):
+                logger.warning(f"获取分类 {category_id} 第 {page} 页失败: {page_data}")
+                continue
+            rows.extend(page_data["rows"])
+            pages_fetched += 1
+
+        return {
+            "total": first["total"],
+            "total_pages": first["total_pages"],
+            "pages_fetched": pages_fetched,
+            "columns": _DRAMA_FIELDS,
+            "rows": rows
+        }
+
+    async def _get_recommend_data(self, category_id: Optional[int] = None, size: int = 10) -> _ApiResult:
+        """获取推荐短剧数据"""
+        params = [("size", size)]
+        if category_id is not None:
+            params.append(("categoryId", category_id))
+
+        return await self._make_request("/vod/recommend", params)
+
+    async def _get_latest_data(self, page: int = 1) -> _ApiResult:
+        """获取最新短剧数据，只保留需要的字段"""
+        result = await self._make_request("/vod/latest", [("page", page)])
+        if isinstance(result, _ApiError):
+            return result
+
+        data = {"list": [_project_drama(drama) for drama in result.get("list", ())]}
+        for key in ("total", "currentPage", "totalPages"):
+            if key in result:
+                data[key] = result[key]
+        return data
+
+    async def _get_episodes_data(self, drama_id: int, episode: int) -> _ApiResult:
+        """获取单集播放数据"""
+        return await self._make_request("/vod/parse/single", [
+            ("id", drama_id),
+            ("episode", episode - 1)  # API使用0基索引
+        ])
+
+    async def _get_all_episodes_data(self, drama_id: int) -> _ApiResult:
+        """获取全集播放数据（仅供命令使用，避免LLM响应过长）"""
+        return await self._make_request("/vod/parse/all", [("id", drama_id)])
 
     # LLM 函数工具定义
     @llm_tool(name="get_drama_categories")
@@ -44,23 +681,17 @@ class DuanjuSearchPlugin(Star):
         """获取短剧分类列表。
         
         Returns:
-            包含所有短剧分类信息的JSON字符串
+            包含所有短剧分类信息的JSON字符串，columns 为字段名，rows 为按字段顺序排列的数据行
         """
-        result = await self._make_request("/vod/categories")
-        if "error" in result:
-            return f"获取分类失败: {result['error']}"
-        
-        categories_info = []
-        for cat in result.get("categories", []):
-            categories_info.append({
-                "id": cat.get("type_id"),
-                "name": cat.get("type_name")
-            })
-        
-        return json.dumps({
-            "categories": categories_info,
-            "total": result.get("total", 0)
-        }, ensure_ascii=False)
+        data = await self._get_categories_data()
+        if isinstance(data, _ApiError):
+            return f"获取分类失败: {data}"
+        
+        # 缓存命中时复用上次的序列化结果
+        cached = self._categories_json
+        if cached is None or cached[0] is not data:
+            cached = self._categories_json = (data, _dumps(data))
+        return cached[1]
 
     @llm_tool(name="search_dramas")
     async def search_dramas(self, event: AstrMessageEvent, name: str) -> str:
@@ -70,26 +701,13 @@ class DuanjuSearchPlugin(Star):
             name(string): 要搜索的短剧名称
             
         Returns:
-            包含搜索结果的JSON字符串
+            包含搜索结果的JSON字符串，columns 为字段名，rows 为按字段顺序排列的数据行
         """
-        result = await self._make_request("/vod/search", {"name": name})
-        if "error" in result:
-            return f"搜索失败: {result['error']}"
-        
-        dramas = []
-        for drama in result.get("list", []):
-            dramas.append({
-                "id": drama.get("id"),
-                "name": drama.get("name"),
-                "cover": drama.get("cover"),
-                "update_time": drama.get("update_time"),
-                "score": drama.get("score")
-            })
-        
-        return json.dumps({
-            "total": result.get("total", 0),
-            "dramas": dramas
-        }, ensure_ascii=False)
+        data = await self._search_dramas_data(name)
+        if isinstance(data, _ApiError):
+            return f"搜索失败: {data}"
+        
+        return _dumps(data)
 
     @llm_tool(name="get_category_hot_dramas")
     async def get_category_hot_dramas(self, event: AstrMessageEvent, category_id: int, page: int = 1) -> str:
@@ -100,31 +718,30 @@ class DuanjuSearchPlugin(Star):
             page(number): 页码，默认为1
             
         Returns:
-            包含分类短剧列表的JSON字符串
+            包含分类短剧列表的JSON字符串，columns 为字段名，rows 为按字段顺序排列的数据行
         """
-        result = await self._make_request("/vod/list", {
-            "categoryId": str(category_id),
-            "page": str(page)
-        })
-        if "error" in result:
-            return f"获取分类短剧失败: {result['error']}"
-        
-        dramas = []
-        for drama in result.get("list", []):
-            dramas.append({
-                "id": drama.get("id"),
-                "name": drama.get("name"),
-                "cover": drama.get("cover"),
-                "update_time": drama.get("update_time"),
-                "score": drama.get("score")
-            })
-        
-        return json.dumps({
-            "total": result.get("total", 0),
-            "current_page": result.get("currentPage", page),
-            "total_pages": result.get("totalPages", 1),
-            "dramas": dramas
-        }, ensure_ascii=False)
+        data = await self._get_category_dramas_data(category_id, page)
+        if isinstance(data, _ApiError):
+            return f"获取分类短剧失败: {data}"
+        
+        return _dumps(data)
+
+    @llm_tool(name="get_all_category_dramas")
+    async def get_all_category_dramas(self, event: AstrMessageEvent, category_id: int, max_pages: int = 5) -> str:
+        """一次性获取指定分类下多页短剧列表，适用于用户想浏览某分类全部短剧的场景。
+        
+        Args:
+            category_id(number): 短剧分类ID
+            max_pages(number): 最多获取的页数，默认为5，最大为10
+            
+        Returns:
+            包含合并后分类短剧列表的JSON字符串，columns 为字段名，rows 为按字段顺序排列的数据行
+        """
+        data = await self._get_all_category_dramas_data(category_id, max_pages)
+        if isinstance(data, _ApiError):
+            return f"获取分类短剧失败: {data}"
+        
+        return _dumps(data)
 
     @llm_tool(name="get_drama_recommendations")
     async def get_drama_recommendations(self, event: AstrMessageEvent, category_id: Optional[int] = None, size: int = 10) -> str:
@@ -137,15 +754,11 @@ class DuanjuSearchPlugin(Star):
         Returns:
             包含推荐短剧的JSON字符串
         """
-        params = {"size": str(size)}
-        if category_id is not None:
-            params["categoryId"] = str(category_id)
-            
-        result = await self._make_request("/vod/recommend", params)
-        if "error" in result:
-            return f"获取推荐失败: {result['error']}"
+        data = await self._get_recommend_data(category_id, size)
+        if isinstance(data, _ApiError):
+            return f"获取推荐失败: {data}"
         
-        return json.dumps(result, ensure_ascii=False)
+        return _dumps(data)
 
     @llm_tool(name="get_latest_dramas")
     async def get_latest_dramas(self, event: AstrMessageEvent, page: int = 1) -> str:
@@ -157,11 +770,11 @@ class DuanjuSearchPlugin(Star):
         Returns:
             包含最新短剧列表的JSON字符串
         """
-        result = await self._make_request("/vod/latest", {"page": str(page)})
-        if "error" in result:
-            return f"获取最新短剧失败: {result['error']}"
+        data = await self._get_latest_data(page)
+        if isinstance(data, _ApiError):
+            return f"获取最新短剧失败: {data}"
         
-        return json.dumps(result, ensure_ascii=False)
+        return _dumps(data)
 
     @llm_tool(name="get_drama_episodes")
     async def get_drama_episodes(self, event: AstrMessageEvent, drama_id: int, episode: int) -> str:
@@ -175,32 +788,31 @@ class DuanjuSearchPlugin(Star):
             包含单集播放信息的JSON字符串，如果用户想要全集地址则提示使用命令
         """
         # 只支持单集获取
-        result = await self._make_request("/vod/parse/single", {
-            "id": str(drama_id),
-            "episode": episode - 1  # API使用0基索引
-        })
-        
-        if "error" in result:
-            return f"获取剧集信息失败: {result['error']}"
+        data = await self._get_episodes_data(drama_id, episode)
+        if isinstance(data, _ApiError):
+            return f"获取剧集信息失败: {data}"
         
-        return json.dumps(result, ensure_ascii=False)
+        return _dumps(data)
 
     # 命令处理器
     @filter.command("短剧分类", "duanju_categories")
     async def cmd_categories(self, event: AstrMessageEvent):
         """获取短剧分类列表"""
-        result = await self.get_drama_categories(event)
-        try:
-            data = json.loads(result)
-            if "categories" in data:
-                text = "📺 短剧分类列表：\n\n"
-                for cat in data["categories"]:
-                    text += f"🎬 {cat['name']} (ID: {cat['id']})\n"
-                text += f"\n共 {data['total']} 个分类"
-            else:
-                text = result
-        except:
-            text = result
+        cache_key = ("categories",)
+        text = self._get_cached_text(cache_key)
+        if text is not None:
+            yield event.plain_result(text)
+            return
+        
+        data = await self._get_categories_data()
+        if isinstance(data, _ApiError):
+            text = f"获取分类失败: {data}"
+        else:
+            parts = ["📺 短剧分类列表：\n\n"]
+            parts.extend(f"🎬 {cat_name} (ID: {cat_id})\n" for cat_id, cat_name in data["rows"])
+            parts.append(f"\n共 {data['total']} 个分类")
+            text = "".join(parts)
+            self._cache_text(cache_key, text)
         
         yield event.plain_result(text)
 
@@ -208,156 +820,161 @@ class DuanjuSearchPlugin(Star):
     @filter.command("搜索短剧")
     async def cmd_search(self, event: AstrMessageEvent):
         """搜索短剧 - 使用方法: /搜索短剧 剧名"""
-        args = event.message_str.split(" ", 1)
-        if len(args) < 2:
+        match = _SEARCH_RE.match(event.message_str)
+        if not match:
             yield event.plain_result("❌ 请提供要搜索的短剧名称\n使用方法: /搜索短剧 剧名")
             return
         
-        drama_name = args[1].strip()
-        result = await self.search_dramas(event, drama_name)
+        drama_name = match.group(1)
+        cache_key = ("search", drama_name)
+        text = self._get_cached_text(cache_key)
+        if text is not None:
+            yield event.plain_result(text)
+            return
         
-        try:
-            data = json.loads(result)
-            if "dramas" in data and data["dramas"]:
-                text = f"🔍 搜索 '{drama_name}' 的结果：\n\n"
-                for drama in data["dramas"][:5]:  # 只显示前5个结果
-                    text += f"🎬 {drama['name']}\n"
-                    text += f"   📊 评分: {drama['score']}\n"
-                    text += f"   🆔 ID: {drama['id']}\n"
-                    text += f"   📅 更新: {drama['update_time']}\n\n"
-                
-                if data["total"] > 5:
-                    text += f"... 还有 {data['total'] - 5} 个结果"
-            else:
-                text = f"😔 没有找到包含 '{drama_name}' 的短剧"
-        except:
-            text = result
+        data = await self._search_dramas_data(drama_name, max_items=5)  # 只显示前5个结果
+        
+        if isinstance(data, _ApiError):
+            text = f"搜索失败: {data}"
+        elif data["rows"]:
+            parts = [f"🔍 搜索 '{drama_name}' 的结果：\n\n"]
+            parts.append(_format_drama_rows(data["rows"]))
+            
+            remaining = data["total"] - 5
+            if remaining > 0:
+                parts.append(f"... 还有 {remaining} 个结果")
+            text = "".join(parts)
+        else:
+            text = f"😔 没有找到包含 '{drama_name}' 的短剧"
         
+        if not isinstance(data, _ApiError):
+            self._cache_text(cache_key, text)
         yield event.plain_result(text)
 
 
     @filter.command("短剧推荐", "duanju_recommend")
     async def cmd_recommend(self, event: AstrMessageEvent):
         """获取推荐短剧"""
-        result = await self.get_drama_recommendations(event, size=5)
+        cache_key = ("recommend",)
+        text = self._get_cached_text(cache_key)
+        if text is not None:
+            yield event.plain_result(text)
+            return
         
-        try:
-            data = json.loads(result)
-            if "list" in data and data["list"]:
-                text = "🌟 为您推荐的短剧：\n\n"
-                for drama in data["list"]:
-                    text += f"🎬 {drama.get('name', '未知')}\n"
-                    text += f"   📊 评分: {drama.get('score', 'N/A')}\n"
-                    text += f"   🆔 ID: {drama.get('id', 'N/A')}\n"
-                    text += f"   📅 更新: {drama.get('update_time', 'N/A')}\n\n"
-            elif "error" in data:
-                text = f"❌ {data['error']}"
-            else:
-                text = "😔 暂无推荐短剧"
-        except:
-            text = result
+        data = await self._get_recommend_data(size=_RECOMMEND_COMMAND_SIZE)
+        
+        if isinstance(data, _ApiError):
+            text = f"❌ 获取推荐失败: {data}"
+        elif data.get("list"):
+            parts = ["🌟 为您推荐的短剧：\n\n"]
+            parts.append(_format_drama_rows(data["list"]))
+            text = "".join(parts)
+        else:
+            text = "😔 暂无推荐短剧"
         
+        if not isinstance(data, _ApiError):
+            self._cache_text(cache_key, text)
         yield event.plain_result(text)
 
 
     @filter.command("最新短剧", "duanju_latest")
     async def cmd_latest(self, event: AstrMessageEvent):
         """获取最新短剧"""
-        result = await self.get_latest_dramas(event)
+        cache_key = ("latest",)
+        text = self._get_cached_text(cache_key)
+        if text is not None:
+            yield event.plain_result(text)
+            return
         
-        try:
-            data = json.loads(result)
-            if "list" in data and data["list"]:
-                text = "🆕 最新短剧：\n\n"
-                for drama in data["list"]:
-                    text += f"🎬 {drama.get('name', '未知')}\n"
-                    text += f"   📊 评分: {drama.get('score', 'N/A')}\n"
-                    text += f"   🆔 ID: {drama.get('id', 'N/A')}\n"
-                    text += f"   📅 更新: {drama.get('update_time', 'N/A')}\n\n"
-                
-                # 显示分页信息（如果有）
-                if "totalPages" in data and "currentPage" in data:
-                    text += f"第 {data.get('currentPage', 1)}/{data.get('totalPages', 1)} 页，共 {data.get('total', 0)} 部短剧"
-            elif "error" in data:
-                text = f"❌ {data['error']}"
-            else:
-                text = "😔 暂无最新短剧"
-        except:
-            text = result
+        data = await self._get_latest_data()
+        
+        if isinstance(data, _ApiError):
+            text = f"❌ 获取最新短剧失败: {data}"
+        elif data.get("list"):
+            parts = ["🆕 最新短剧：\n\n"]
+            parts.append(_format_drama_rows(data["list"]))
+            
+            # 显示分页信息（如果有）
+            if "totalPages" in data and "currentPage" in data:
+                parts.append(f"第 {data.get('currentPage', 1)}/{data.get('totalPages', 1)} 页，共 {data.get('total', 0)} 部短剧")
+            text = "".join(parts)
+        else:
+            text = "😔 暂无最新短剧"
         
+        if not isinstance(data, _ApiError):
+            self._cache_text(cache_key, text)
         yield event.plain_result(text)
 
 
     @filter.command("分类短剧")
     async def cmd_category_dramas(self, event: AstrMessageEvent):
         """获取分类短剧 - 使用方法: /分类短剧 分类ID [页码]"""
-        args = event.message_str.split(" ")
-        if len(args) < 2:
-            yield event.plain_result("❌ 请提供分类ID\n使用方法: /分类短剧 分类ID [页码]")
+        match = _ID_ARGS_RE.match(event.message_str)
+        if match is None:
+            if len(event.message_str.split(None, 1)) < 2:
+                yield event.plain_result("❌ 请提供分类ID\n使用方法: /分类短剧 分类ID [页码]")
+            else:
+                yield event.plain_result("❌ 参数格式错误，分类ID和页码必须是数字")
             return
         
-        try:
-            category_id = int(args[1])
-            page = int(args[2]) if len(args) > 2 else 1
-        except ValueError:
-            yield event.plain_result("❌ 参数格式错误，分类ID和页码必须是数字")
+        category_id = int(match.group(1))
+        page = int(match.group(2)) if match.group(2) else 1
+        cache_key = ("category", category_id, page)
+        text = self._get_cached_text(cache_key)
+        if text is not None:
+            yield event.plain_result(text)
             return
         
-        result = await self.get_category_hot_dramas(event, category_id, page)
+        data = await self._get_category_dramas_data(category_id, page)
         
-        try:
-            data = json.loads(result)
-            if "dramas" in data and data["dramas"]:
-                text = f"📂 分类 {category_id} 的短剧 (第 {data['current_page']}/{data['total_pages']} 页)：\n\n"
-                for drama in data["dramas"]:
-                    text += f"🎬 {drama['name']}\n"
-                    text += f"   📊 评分: {drama['score']}\n"
-                    text += f"   🆔 ID: {drama['id']}\n"
-                    text += f"   📅 更新: {drama['update_time']}\n\n"
-                
-                text += f"共 {data['total']} 部短剧"
-            else:
-                text = f"😔 分类 {category_id} 下暂无短剧"
-        except:
-            text = result
+        if isinstance(data, _ApiError):
+            text = f"获取分类短剧失败: {data}"
+        elif data["rows"]:
+            parts = [f"📂 分类 {category_id} 的短剧 (第 {data['current_page']}/{data['total_pages']} 页)：\n\n"]
+            parts.append(_format_drama_rows(data["rows"]))
+            
+            parts.append(f"共 {data['total']} 部短剧")
+            text = "".join(parts)
+        else:
+            text = f"😔 分类 {category_id} 下暂无短剧"
         
+        if not isinstance(data, _ApiError):
+            self._cache_text(cache_key, text)
         yield event.plain_result(text)
 
 
     @filter.command("获取剧集")
     async def cmd_get_episodes(self, event: AstrMessageEvent):
         """获取剧集播放地址 - 使用方法: /获取剧集 短剧ID [集数]"""
-        args = event.message_str.split(" ")
-        if len(args) < 2:
-            yield event.plain_result("❌ 请提供短剧ID\n使用方法: /获取剧集 短剧ID [集数]\n不指定集数则获取全集")
+        match = _ID_ARGS_RE.match(event.message_str)
+        if match is None:
+            if len(event.message_str.split(None, 1)) < 2:
+                yield event.plain_result("❌ 请提供短剧ID\n使用方法: /获取剧集 短剧ID [集数]\n不指定集数则获取全集")
+            else:
+                yield event.plain_result("❌ 参数格式错误，短剧ID和集数必须是数字")
             return
         
-        try:
-            drama_id = int(args[1])
-            episode = int(args[2]) if len(args) > 2 else None
-        except ValueError:
-            yield event.plain_result("❌ 参数格式错误，短剧ID和集数必须是数字")
+        drama_id = int(match.group(1))
+        episode = int(match.group(2)) if match.group(2) else None
+        cache_key = ("episodes", drama_id, episode)
+        text = self._get_cached_text(cache_key)
+        if text is not None:
+            yield event.plain_result(text)
             return
         
-        # 直接调用API而不是通过LLM工具函数
         try:
             if episode is not None:
                 # 获取单集地址
-                result = await self._make_request("/vod/parse/single", {
-                    "id": str(drama_id),
-                    "episode": episode - 1  # API使用0基索引
-                })
+                result = await self._get_episodes_data(drama_id, episode)
             else:
                 # 获取全集地址
-                result = await self._make_request("/vod/parse/all", {
-                    "id": str(drama_id)
-                })
+                result = await self._get_all_episodes_data(drama_id)
         except Exception as e:
             yield event.plain_result(f"❌ 请求失败: {str(e)}")
             return
         
-        if "error" in result:
-            yield event.plain_result(f"❌ {result['error']}")
+        if isinstance(result, _ApiError):
+            yield event.plain_result(f"❌ {result}")
             return
         
         try:
@@ -366,27 +983,26 @@ class DuanjuSearchPlugin(Star):
                 video_name = result.get("videoName", "未知短剧")
                 episode_info = result.get("episode", {})
                 
-                text = f"🎬 {video_name} - 第 {episode} 集\n\n"
+                parts = [f"🎬 {video_name} - 第 {episode} 集\n\n"]
                 
                 if "parsedUrl" in episode_info:
-                    text += f"📺 播放链接: {episode_info['parsedUrl']}\n"
-                    text += f"🏷️ 集数标签: {episode_info.get('label', f'第{episode}集')}\n"
+                    parts.append(f"📺 播放链接: {episode_info['parsedUrl']}\n")
+                    parts.append(f"🏷️ 集数标签: {episode_info.get('label', f'第{episode}集')}\n")
                     
                     parse_info = episode_info.get("parseInfo", {})
                     if "type" in parse_info:
-                        text += f"📄 文件类型: {parse_info['type']}\n"
+                        parts.append(f"📄 文件类型: {parse_info['type']}\n")
                 
                 total_episodes = result.get("totalEpisodes")
                 if total_episodes:
-                    text += f"📊 总集数: {total_episodes}\n"
+                    parts.append(f"📊 总集数: {total_episodes}\n")
                 
                 # 添加短剧描述（截取前100字符）
                 description = result.get("description", "")
                 if description:
-                    desc_short = description[:100] + "..." if len(description) > 100 else description
-                    text += f"\n📝 简介: {desc_short}"
+                    parts.append(f"\n📝 简介: {_truncate(description)}")
                 else:
-                    text += "\n😔 未找到播放地址"
+                    parts.append("\n😔 未找到播放地址")
             else:
                 # 全集结果解析
                 video_name = result.get("videoName", "未知短剧")
@@ -395,33 +1011,37 @@ class DuanjuSearchPlugin(Star):
                 successful_count = result.get("successfulCount", 0)
                 failed_count = result.get("failedCount", 0)
                 
-                text = f"🎬 {video_name} - 全集播放地址\n\n"
-                text += f"📊 总集数: {total_episodes}\n"
-                text += f"✅ 成功解析: {successful_count} 集\n"
-                text += f"❌ 解析失败: {failed_count} 集\n\n"
+                parts = [
+                    f"🎬 {video_name} - 全集播放地址\n\n"
+                    f"📊 总集数: {total_episodes}\n"
+                    f"✅ 成功解析: {successful_count} 集\n"
+                    f"❌ 解析失败: {failed_count} 集\n\n"
+                ]
                 
                 # 显示前10集的播放地址
-                success_episodes = [ep for ep in results if ep.get("status") == "success"]
-                display_episodes = success_episodes[:10]
+                display_episodes = list(islice((ep for ep in results if ep.get("status") == "success"), 10))
                 
                 for ep_info in display_episodes:
                     label = ep_info.get("label", f"第{ep_info.get('index', 0) + 1}集")
-                    text += f"📺 {label}: {ep_info.get('parsedUrl', 'N/A')}\n"
+                    parts.append(f"📺 {label}: {ep_info.get('parsedUrl', 'N/A')}\n")
                 
-                if len(success_episodes) > 10:
-                    text += f"\n... 还有 {len(success_episodes) - 10} 集成功解析的地址\n"
+                # 剩余数量直接使用上游统计的成功数，找到前10集后即停止扫描
+                remaining = max(0, successful_count - len(display_episodes))
+                if remaining > 0:
+                    parts.append(f"\n... 还有 {remaining} 集成功解析的地址\n")
                 
                 if failed_count > 0:
-                    text += f"\n⚠️ 注意: {failed_count} 集解析失败，可能暂时无法播放"
+                    parts.append(f"\n⚠️ 注意: {failed_count} 集解析失败，可能暂时无法播放")
                 
                 # 添加短剧描述（截取前100字符）
                 description = result.get("description", "")
                 if description:
-                    desc_short = description[:100] + "..." if len(description) > 100 else description
-                    text += f"\n\n📝 简介: {desc_short}"
-                    
+                    parts.append(f"\n\n📝 简介: {_truncate(description)}")
+            
+            text = "".join(parts)
+            self._cache_text(cache_key, text)
         except Exception as e:
-            text = f"❌ 解析响应失败: {str(e)}\n原始数据: {json.dumps(result, ensure_ascii=False)[:200]}..."
+            text = f"❌ 解析响应失败: {str(e)}\n原始数据: {_dumps(result)[:200]}..."
         
         yield event.plain_result(text)
         
\ No newline at end of file